@@ -6,14 +6,20 @@ Routes tasks through a local Ollama model with confidence gating and self-valida
 
 Usage:
     python router.py "your task here"
+    python router.py -- "-v explain"   # use -- when the task starts with a dash
     
 Module:
     from router import route_task
     result = route_task("your task here")
 """
 
+import argparse
+import http.client
 import json
-import sys
+import math
+import random
+import re
+import time
 import urllib.request
 import urllib.error
 from typing import Any
@@ -22,6 +28,13 @@ OLLAMA_URL = "http://127.0.0.1:11434/v1/chat/completions"
 MODEL = "deepseek-r1:14b-qwen-distill-q8_0"
 TIMEOUT = 300  # seconds per API call
 CONFIDENCE_THRESHOLD = 7
+MAX_RETRIES = 4  # retries per API call on 429/5xx or connection failure
+BACKOFF_MAX = 30  # seconds, cap on a single retry wait
+
+_THINK_RE = re.compile(r"<think>.*?(?:</think>|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
+_DECODER = json.JSONDecoder()
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
 
 
 def _chat(messages: list[dict[str, str]], temperature: float = 0.3) -> str:
@@ -38,9 +51,41 @@ def _chat(messages: list[dict[str, str]], temperature: float = 0.3) -> str:
         data=payload,
         headers={"Content-Type": "application/json"},
     )
-    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-        data = json.loads(resp.read())
-    return data["choices"][0]["message"]["content"]
+    attempt = 0
+    while True:
+        try:
+            with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+                data = json.loads(resp.read())
+            return data["choices"][0]["message"]["content"]
+        except urllib.error.HTTPError as e:
+            if e.code not in _RETRY_STATUS or attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt, e.headers.get("Retry-After"))
+            e.close()
+        except urllib.error.URLError as e:
+            # Connection refused, e.g. Ollama not up yet; a connect timeout is not retried
+            if isinstance(e.reason, TimeoutError) or attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt)
+        except (ConnectionResetError, http.client.IncompleteRead):
+            # Connection dropped mid-request or mid-body, e.g. Ollama restarted or ran out of memory
+            if attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt)
+        time.sleep(delay)
+        attempt += 1
+
+
+def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds to wait before the next retry: Retry-After if given, else jittered exponential."""
+    if retry_after:
+        try:
+            value = float(retry_after)
+        except ValueError:
+            value = math.nan  # HTTP-date form; fall through to computed backoff
+        if math.isfinite(value):
+            return max(0.0, min(value, BACKOFF_MAX))
+    return random.uniform(0, min(BACKOFF_MAX, 2 ** attempt))
 
 
 def _parse_json_from(text: str) -> dict[str, Any]:
@@ -50,31 +95,24 @@ def _parse_json_from(text: str) -> dict[str, Any]:
         return json.loads(text)
     except json.JSONDecodeError:
         pass
-    # Look for ```json fences or bare { ... }
-    for start_tok in ("```json", "```", "{"):
-        idx = text.find(start_tok)
-        if idx == -1:
-            continue
-        fragment = text[idx:]
-        if fragment.startswith("```"):
-            fragment = fragment.split("\n", 1)[-1].rsplit("```", 1)[0]
-        # Find outermost braces
-        brace_start = fragment.find("{")
-        if brace_start == -1:
-            continue
-        depth, end = 0, brace_start
-        for i, ch in enumerate(fragment[brace_start:], brace_start):
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    end = i + 1
-                    break
+    # deepseek-r1 reasons inside <think> tags (unclosed if cut off); JSON drafted there is not the answer
+    text = _THINK_RE.sub("", text)
+    # Some chat templates put the opening <think> in the prompt, leaving only a lone </think>
+    text = text.rpartition("</think>")[2] or text
+    # Prefer a fenced ```json block, then let the C decoder parse from each candidate brace
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        try:
+            return json.loads(fenced.group(1))
+        except json.JSONDecodeError:
+            pass
+    idx = text.find("{")
+    while idx != -1:
         try:
-            return json.loads(fragment[brace_start:end])
+            obj, _ = _DECODER.raw_decode(text, idx)
+            return obj
         except json.JSONDecodeError:
-            continue
+            idx = text.find("{", idx + 1)
     return {}
 
 
@@ -154,7 +192,7 @@ def route_task(task: str) -> dict[str, Any]:
     # Phase 1: Confidence evaluation
     try:
         score, criteria, reasoning = _evaluate_confidence(task)
-    except (urllib.error.URLError, TimeoutError, OSError) as e:
+    except (urllib.error.URLError, TimeoutError, OSError, http.client.HTTPException) as e:
         result["reasoning"] = f"Confidence evaluation failed: {e}"
         result["fallback_needed"] = True
         return result
@@ -172,7 +210,7 @@ def route_task(task: str) -> dict[str, Any]:
     # Phase 2: Attempt
     try:
         solution = _attempt_task(task, criteria)
-    except (urllib.error.URLError, TimeoutError, OSError) as e:
+    except (urllib.error.URLError, TimeoutError, OSError, http.client.HTTPException) as e:
         result["reasoning"] += f" | Attempt failed: {e}"
         result["fallback_needed"] = True
         return result
@@ -182,7 +220,7 @@ def route_task(task: str) -> dict[str, Any]:
     # Phase 3: Validation
     try:
         passed = _validate_solution(task, solution, criteria)
-    except (urllib.error.URLError, TimeoutError, OSError) as e:
+    except (urllib.error.URLError, TimeoutError, OSError, http.client.HTTPException) as e:
         result["reasoning"] += f" | Validation failed: {e}"
         result["passed_validation"] = False
         return result
@@ -195,10 +233,12 @@ def route_task(task: str) -> dict[str, Any]:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} \"your task here\"", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Route a task through the local Ollama model")
+    parser.add_argument("task", nargs="+", help="Task text (multiple words are joined; put -- before a task starting with '-')")
+    args = parser.parse_args()
 
-    task_input = " ".join(sys.argv[1:])
+    task_input = " ".join(args.task).strip()
+    if not task_input:
+        parser.error("task must not be empty")
     output = route_task(task_input)
     print(json.dumps(output, indent=2, ensure_ascii=False))
@@ -2,6 +2,7 @@
 """Exa.ai neural search CLI."""
 
 import argparse
+import http.client
 import json
 import os
 import urllib.request
@@ -9,6 +10,7 @@ import urllib.error
 from pathlib import Path
 
 API_URL = "https://api.exa.ai/search"
+TIMEOUT = 30  # seconds per API call
 
 # Load .env file if present
 def load_env():
@@ -58,12 +60,23 @@ def search(query, num_results=5, include_text=False, include_summary=False, sear
     )
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            body = resp.read()
+            if resp.status == 204 or not body.strip():
+                return {"error": f"Empty response (HTTP {resp.status})"}
+            try:
+                return json.loads(body)
+            except ValueError:
+                return {"error": f"Invalid JSON response (HTTP {resp.status})"}
     except urllib.error.HTTPError as e:
         return {"error": f"HTTP {e.code}: {e.read().decode('utf-8', errors='replace')}"}
     except urllib.error.URLError as e:
         return {"error": f"Request failed: {e.reason}"}
+    except (OSError, http.client.HTTPException) as e:
+        # Read timeouts and dropped/truncated connections are not wrapped in URLError
+        if isinstance(e, TimeoutError):
+            return {"error": f"Request timed out after {TIMEOUT}s"}
+        return {"error": f"Request failed: {e}"}
 
 
 def format_results(data):